@@ -2,9 +2,14 @@
 """
 Google Doc to Blog Post Publisher
 ==================================
-Converts a Google Doc to HTML using your template, downloads images,
+Converts a Google Doc to HTML using your template, saves its images,
 updates the index page, and pushes to Git.
 
+The doc is fetched as one zipped web page export (HTML plus images in a
+single request); a local .zip export works the same way. Images the doc
+links to but the export doesn't include (http/https URLs) are downloaded
+concurrently over a pooled session.
+
 Usage:
     python publish.py "https://docs.google.com/document/d/DOC_ID/edit"
     python publish.py "https://docs.google.com/document/d/DOC_ID/edit" --no-push
@@ -12,29 +17,30 @@ Usage:
     python publish.py --verify
 
 Requirements:
-    pip install requests beautifulsoup4 python-slugify
+    pip install requests beautifulsoup4 lxml python-slugify
 """
 
 import argparse
+import functools
 import os
 import re
+import shlex
 import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 from urllib.parse import urlparse, parse_qs, unquote
 import hashlib
+import io
+import json
 import math
+import pickle
+import zipfile
 
-try:
-    import requests
-    from bs4 import BeautifulSoup, NavigableString
-    from slugify import slugify
-except ImportError:
-    print("❌ Missing dependencies. Install with:")
-    print("   pip install requests beautifulsoup4 python-slugify")
-    sys.exit(1)
+# Third-party packages are imported where they are used, so --verify never
+# pays for loading them; check_dependencies() reports a missing install up front
 
 
 # =============================================================================
@@ -49,21 +55,28 @@ POSTS_DIR = "posts"                         # Where post HTML files go
 IMAGES_DIR = "images/posts"                 # Where post images go  
 TEMPLATE_FILE = "posts/post-template.html"  # Your template (in posts folder)
 INDEX_FILE = "index.html"                   # Main index page
+CACHE_DIR = ".publish-cache"                # Local build cache (git-ignored)
+
+# Number of images downloaded concurrently
+IMAGE_DOWNLOAD_WORKERS = 8
 
 # Git settings
 GIT_REMOTE = "origin"
 GIT_BRANCH = "master"
 
 # Template patterns - UPDATE THESE if you change your template's class names
-# Format: 'description': (search_pattern, is_required)
+# Format: 'description': (compiled_pattern, is_required)
 TEMPLATE_PATTERNS = {
-    'title_tag': (r'<title>.*?</title>', True),
-    'meta_description': (r'<meta name="description"\s+content="[^"]*">', True),
-    'post_title': (r'<h1 class="post-header__title">.*?</h1>', True),
-    'post_subtitle': (r'<p class="post-header__subtitle">.*?</p>', True),
-    'post_meta': (r'<p class="post-header__meta">.*?</p>', True),
-    'post_body': (r'<div class="post-body">.*?</div>\s*\n\s*<div class="author-card">', True),
-    'author_card': (r'<div class="author-card">', True),
+    name: (re.compile(pattern, re.DOTALL), required)
+    for name, (pattern, required) in {
+        'title_tag': (r'<title>.*?</title>', True),
+        'meta_description': (r'<meta name="description"\s+content="[^"]*">', True),
+        'post_title': (r'<h1 class="post-header__title">.*?</h1>', True),
+        'post_subtitle': (r'<p class="post-header__subtitle">.*?</p>', True),
+        'post_meta': (r'<p class="post-header__meta">.*?</p>', True),
+        'post_body': (r'<div class="post-body">.*?</div>\s*\n\s*<div class="author-card">', True),
+        'author_card': (r'<div class="author-card">', True),
+    }.items()
 }
 
 # Author name for title tag (change if needed)
@@ -73,12 +86,72 @@ AUTHOR_NAME = "Junaid Akhtar"
 # END CONFIGURATION
 # =============================================================================
 
+# Template fields filled by generate_post_html, matched together in a single pass
+_FILL_FIELDS = ('title_tag', 'meta_description', 'post_title', 'post_subtitle', 'post_meta', 'post_body')
+_TEMPLATE_FILL_RE = re.compile(
+    '|'.join(f'(?P<{name}>{TEMPLATE_PATTERNS[name][0].pattern})' for name in _FILL_FIELDS),
+    re.DOTALL
+)
+
+# Compiled once at import so each publish run skips the re module's cache lookups
+_POSTS_LIST_RE = re.compile(r'(<ul class="posts-list">)\s*')
+
+# Target URL inside Google's google.com/url?q=... link redirects
+_GOOG_Q_RE = re.compile(r'[?&]q=([^&]+)')
+
+# Inline styles Google Docs uses for bold and italic spans
+_BOLD_RE = re.compile(r'font-weight\s*:\s*(?:700|bold)', re.I)
+_ITALIC_RE = re.compile(r'font-style\s*:\s*italic', re.I)
+
+# Stand-in for the post's image folder in parsed content; filled in once the slug is known
+_IMG_DIR_TOKEN = "{IMG_DIR}"
+
+# Elements parse_google_doc_html turns into post content
+_CONTENT_TAGS = frozenset({'p', 'h1', 'h2', 'h3', 'h4', 'ul', 'ol', 'img'})
+
+# ASCII slug pipeline: every character outside [-a-z0-9] becomes a dash, then runs collapse
+_SLUG_TABLE = str.maketrans({chr(c): '-' for c in range(128)
+                             if not (chr(c).isdigit() or 'a' <= chr(c) <= 'z' or chr(c) == '-')})
+_SLUG_DASHES_RE = re.compile(r'-+')
+_SLUG_NUMBER_COMMA_RE = re.compile(r'(?<=\d),(?=\d)')
+
+# English month names for post dates (what strftime('%B') gives in the default C locale)
+_MONTHS = ('January', 'February', 'March', 'April', 'May', 'June', 'July',
+           'August', 'September', 'October', 'November', 'December')
+
 
 class PublishError(Exception):
     """Custom exception for publish errors."""
     pass
 
 
+def check_dependencies() -> None:
+    """Exit with install instructions if a third-party package is missing."""
+    try:
+        import requests  # noqa: F401
+        import bs4  # noqa: F401
+        import lxml  # noqa: F401 - parser backend for BeautifulSoup
+        import slugify  # noqa: F401
+    except ImportError:
+        print("❌ Missing dependencies. Install with:")
+        print("   pip install requests beautifulsoup4 lxml python-slugify")
+        sys.exit(1)
+
+
+@functools.lru_cache(maxsize=None)
+def get_session():
+    """
+    Shared HTTP session: the doc export and every image download reuse its
+    keep-alive connections instead of opening a new one per request.
+    """
+    import requests
+    
+    session = requests.Session()
+    session.mount('https://', requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16))
+    session.headers['User-Agent'] = 'myBlog-publish/1.0'
+    return session
+
+
 # =============================================================================
 # VERIFICATION FUNCTIONS
 # =============================================================================
@@ -87,29 +160,43 @@ def verify_environment() -> tuple[bool, list[str]]:
     """Verify the blog environment is correctly set up."""
     issues = []
     
-    # Check blog root
-    if not BLOG_ROOT.exists():
+    # Check blog root; its listing answers the top-level checks below, so
+    # each folder costs one scandir() instead of a stat() per path
+    try:
+        with os.scandir(BLOG_ROOT) as entries:
+            listings = {BLOG_ROOT: {entry.name for entry in entries}}
+    except FileNotFoundError:
         issues.append(f"Blog root not found: {BLOG_ROOT}")
         return False, issues
     
+    def exists(path: Path) -> bool:
+        parent = path.parent
+        if parent not in listings:
+            try:
+                with os.scandir(parent) as entries:
+                    listings[parent] = {entry.name for entry in entries}
+            except OSError:
+                listings[parent] = set()
+        return path.name in listings[parent]
+    
     # Check required directories exist
     posts_dir = BLOG_ROOT / POSTS_DIR
-    if not posts_dir.exists():
+    if not exists(posts_dir):
         issues.append(f"Posts directory not found: {posts_dir}")
     
     # Check template exists
     template_path = BLOG_ROOT / TEMPLATE_FILE
-    if not template_path.exists():
+    if not exists(template_path):
         issues.append(f"Template not found: {template_path}")
     
     # Check index exists
     index_path = BLOG_ROOT / INDEX_FILE
-    if not index_path.exists():
+    if not exists(index_path):
         issues.append(f"Index file not found: {index_path}")
     
     # Check if git is initialized
     git_dir = BLOG_ROOT / ".git"
-    if not git_dir.exists():
+    if not exists(git_dir):
         issues.append(f"Git not initialized in {BLOG_ROOT} (no .git folder)")
     
     return len(issues) == 0, issues
@@ -120,33 +207,33 @@ def verify_git() -> tuple[bool, list[str]]:
     issues = []
     
     try:
-        os.chdir(BLOG_ROOT)
-        
-        # Check if git is available
-        result = subprocess.run(['git', '--version'], capture_output=True, text=True)
-        if result.returncode != 0:
-            issues.append("Git is not installed or not in PATH")
-            return False, issues
-        
-        # Check if this is a git repo
-        result = subprocess.run(['git', 'rev-parse', '--git-dir'], capture_output=True, text=True)
+        # One status call answers "is git installed", "is this a repo",
+        # "which branch" and "anything uncommitted"
+        result = subprocess.run(
+            ['git', 'status', '--porcelain=v2', '--branch'], cwd=BLOG_ROOT, capture_output=True, text=True
+        )
         if result.returncode != 0:
             issues.append("Not a git repository")
             return False, issues
         
+        current_branch = ''
+        has_changes = False
+        for line in result.stdout.splitlines():
+            if line.startswith('# branch.head '):
+                current_branch = line[len('# branch.head '):]
+            elif not line.startswith('#'):
+                has_changes = True
+        
         # Check if remote exists
-        result = subprocess.run(['git', 'remote', 'get-url', GIT_REMOTE], capture_output=True, text=True)
+        result = subprocess.run(['git', 'remote', 'get-url', GIT_REMOTE], cwd=BLOG_ROOT, capture_output=True, text=True)
         if result.returncode != 0:
             issues.append(f"Git remote '{GIT_REMOTE}' not configured")
         
         # Check for uncommitted changes
-        result = subprocess.run(['git', 'status', '--porcelain'], capture_output=True, text=True)
-        if result.stdout.strip():
+        if has_changes:
             issues.append("You have uncommitted changes. Commit or stash them first.")
         
         # Check current branch
-        result = subprocess.run(['git', 'branch', '--show-current'], capture_output=True, text=True)
-        current_branch = result.stdout.strip()
         if current_branch != GIT_BRANCH:
             issues.append(f"On branch '{current_branch}', expected '{GIT_BRANCH}'")
         
@@ -161,19 +248,38 @@ def verify_template(template_path: Path) -> tuple[bool, list[str], dict[str, boo
     Verify the template has all required patterns.
     Returns (is_valid, issues, pattern_status).
     """
-    if not template_path.exists():
+    try:
+        stat = template_path.stat()
+    except FileNotFoundError:
         return False, [f"Template not found: {template_path}"], {}
     
-    template = template_path.read_text(encoding='utf-8')
+    is_valid, issues, pattern_status = _check_template(str(template_path), stat.st_mtime_ns, stat.st_size)
+    return is_valid, list(issues), dict(pattern_status)
+
+
+@functools.lru_cache(maxsize=2)
+def _read_template(path: str, mtime_ns: int, size: int) -> str:
+    """
+    Read one version (path, mtime, size) of a template. Shared by the checks
+    and the compile step, so a publish run decodes the template only once.
+    """
+    return Path(path).read_text(encoding='utf-8')
+
+
+@functools.lru_cache(maxsize=8)
+def _check_template(path: str, mtime_ns: int, size: int) -> tuple[bool, tuple[str, ...], dict[str, bool]]:
+    """Run verify_template's checks on one version (path, mtime, size) of a template."""
+    template_path = Path(path)
+    template = _read_template(path, mtime_ns, size)
     issues = []
     pattern_status = {}
     
     for name, (pattern, required) in TEMPLATE_PATTERNS.items():
-        found = bool(re.search(pattern, template, re.DOTALL))
+        found = bool(pattern.search(template))
         pattern_status[name] = found
         
         if required and not found:
-            issues.append(f"Missing pattern '{name}': {pattern[:50]}...")
+            issues.append(f"Missing pattern '{name}': {pattern.pattern[:50]}...")
     
     # Additional structural checks
     if '<html' not in template:
@@ -184,7 +290,7 @@ def verify_template(template_path: Path) -> tuple[bool, list[str], dict[str, boo
         if 'href="../' not in template and 'src="../' not in template:
             issues.append("Warning: Template may have incorrect relative paths for posts/ folder")
     
-    return len(issues) == 0, issues, pattern_status
+    return len(issues) == 0, tuple(issues), pattern_status
 
 
 def verify_index(index_path: Path) -> tuple[bool, list[str]]:
@@ -211,8 +317,19 @@ def run_full_verification(verbose: bool = True) -> bool:
     if verbose:
         print("🔍 Running full verification...\n")
     
+    template_path = BLOG_ROOT / TEMPLATE_FILE
+    index_path = BLOG_ROOT / INDEX_FILE
+    
+    # The checks are independent disk reads and git subprocesses, so run them
+    # side by side and report the results in order
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        env_future = executor.submit(verify_environment)
+        template_future = executor.submit(verify_template, template_path)
+        index_future = executor.submit(verify_index, index_path)
+        git_future = executor.submit(verify_git)
+    
     # 1. Environment
-    env_ok, env_issues = verify_environment()
+    env_ok, env_issues = env_future.result()
     if verbose:
         if env_ok:
             print("✅ Environment: All paths exist")
@@ -227,8 +344,7 @@ def run_full_verification(verbose: bool = True) -> bool:
         return False
     
     # 2. Template
-    template_path = BLOG_ROOT / TEMPLATE_FILE
-    template_ok, template_issues, pattern_status = verify_template(template_path)
+    template_ok, template_issues, pattern_status = template_future.result()
     if verbose:
         print()
         if template_ok:
@@ -244,8 +360,7 @@ def run_full_verification(verbose: bool = True) -> bool:
             all_ok = False
     
     # 3. Index
-    index_path = BLOG_ROOT / INDEX_FILE
-    index_ok, index_issues = verify_index(index_path)
+    index_ok, index_issues = index_future.result()
     if verbose:
         print()
         if index_ok:
@@ -257,7 +372,7 @@ def run_full_verification(verbose: bool = True) -> bool:
             all_ok = False
     
     # 4. Git
-    git_ok, git_issues = verify_git()
+    git_ok, git_issues = git_future.result()
     if verbose:
         print()
         if git_ok:
@@ -302,17 +417,41 @@ def extract_doc_id(url: str) -> str:
 
 
 def get_export_url(doc_id: str) -> str:
-    """Get the HTML export URL for a Google Doc."""
-    return f"https://docs.google.com/document/d/{doc_id}/export?format=html"
+    """Get the zipped web page export URL for a Google Doc (HTML plus its images)."""
+    return f"https://docs.google.com/document/d/{doc_id}/export?format=zip"
 
 
-def download_google_doc(doc_id: str) -> str:
-    """Download Google Doc as HTML."""
+def download_google_doc(doc_id: str) -> tuple:
+    """
+    Download Google Doc as a zipped web page, in a single request.
+    Returns (html_string, images_dict) like load_local_zip; the export
+    is streamed into one in-memory buffer, never written to a temp file.
+    The last export is kept under CACHE_DIR with its ETag/Last-Modified
+    headers, and is reused when the server reports it unchanged (304).
+    """
+    import requests
+    
     url = get_export_url(doc_id)
     print(f"📥 Downloading Google Doc...")
     
+    cache_dir = BLOG_ROOT / CACHE_DIR / "docs"
+    body_path = cache_dir / f"{doc_id}.zip"
+    meta_path = cache_dir / f"{doc_id}.meta"
+    
+    # Revalidate the cached export instead of downloading it again
+    headers = {}
+    if body_path.exists():
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            meta = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+    
     try:
-        response = requests.get(url, timeout=30)
+        response = get_session().get(url, headers=headers, timeout=30, stream=True)
         response.raise_for_status()
     except requests.exceptions.Timeout:
         raise PublishError("Download timed out. Check your internet connection.")
@@ -326,56 +465,92 @@ def download_google_doc(doc_id: str) -> str:
     except requests.exceptions.RequestException as e:
         raise PublishError(f"Download failed: {e}")
     
-    if len(response.text) < 100:
-        raise PublishError("Downloaded content is too small. The document might be empty.")
+    if response.status_code == 304:
+        source = open(body_path, 'rb')
+        size = os.fstat(source.fileno()).st_size
+        print(f"   ✅ Unchanged since last download, using cached copy ({size:,} bytes)")
+    else:
+        # Stream the body in chunks rather than materializing response.content;
+        # zipfile needs the end of the archive first, so it is read once complete
+        source = io.BytesIO()
+        try:
+            for chunk in response.iter_content(chunk_size=128 * 1024):
+                source.write(chunk)
+        except requests.exceptions.RequestException as e:
+            raise PublishError(f"Download failed: {e}")
+        size = source.tell()
+        if size < 100:
+            raise PublishError("Downloaded content is too small. The document might be empty.")
+        
+        # Remember this export for the next run (best effort)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            try:
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                body_path.write_bytes(source.getbuffer())
+                meta_path.write_text(json.dumps({'etag': etag, 'last_modified': last_modified}), encoding='utf-8')
+            except OSError:
+                pass
+        
+        print(f"   ✅ Downloaded ({size:,} bytes)")
     
-    print(f"   ✅ Downloaded ({len(response.text):,} bytes)\n")
-    return response.text, {}
+    html, images = read_doc_zip(source)
+    print()
+    return html, images
+
 
 def load_local_zip(zip_path: str) -> tuple:
     """
     Load a Google Doc exported as Web Page (.html, zipped).
-    Returns (html_string, images_dict) where images_dict maps
-    original src paths to image bytes.
+    Returns (html_string, images_dict) as read_doc_zip does.
     """
-    import zipfile
-    
     zip_path = Path(zip_path)
     if not zip_path.exists():
         raise PublishError(f"Zip file not found: {zip_path}")
     
     print(f"📦 Loading zip file: {zip_path.name}...")
-    
-    html = None
+    html, images = read_doc_zip(zip_path)
+    print()
+    return html, images
+
+
+def read_doc_zip(source) -> tuple:
+    """
+    Read a zipped web page export from a path or a binary file object.
+    Returns (html_string, images_dict) where images_dict maps
+    original src paths to zipfile.Path entries. Image bytes are
+    only read when the image is saved, straight from the archive.
+    """
     images = {}
     
     try:
-        with zipfile.ZipFile(zip_path, 'r') as zf:
-            names = zf.namelist()
-            
-            # Find the HTML file
-            html_files = [n for n in names if n.endswith('.html')]
-            if not html_files:
-                raise PublishError("No HTML file found in zip. Make sure you exported as 'Web Page (.html, zipped)'.")
-            
-            html_file = html_files[0]
-            html = zf.read(html_file).decode('utf-8')
-            print(f"   ✅ Found HTML: {html_file}")
-            
-            # Load all images
-            image_files = [n for n in names if any(
-                n.lower().endswith(ext) for ext in ['.png', '.jpg', '.jpeg', '.gif', '.webp', '.svg']
-            )]
-            
-            for img_name in image_files:
-                images[img_name] = zf.read(img_name)
-            
-            print(f"   ✅ Found {len(images)} images")
+        # Left open: the returned zipfile.Path entries read from it lazily
+        zf = zipfile.ZipFile(source, 'r')
+        names = zf.namelist()
+        
+        # Find the HTML file
+        html_files = [n for n in names if n.endswith('.html')]
+        if not html_files:
+            raise PublishError("No HTML file found in zip. Make sure you exported as 'Web Page (.html, zipped)'.")
+        
+        html_file = html_files[0]
+        html = zf.read(html_file).decode('utf-8')
+        print(f"   ✅ Found HTML: {html_file}")
+        
+        # Index all images without decompressing them
+        image_files = [n for n in names if any(
+            n.lower().endswith(ext) for ext in ['.png', '.jpg', '.jpeg', '.gif', '.webp', '.svg']
+        )]
+        
+        for img_name in image_files:
+            images[img_name] = zipfile.Path(zf, img_name)
+        
+        print(f"   ✅ Found {len(images)} images")
     
     except zipfile.BadZipFile:
         raise PublishError("File is not a valid zip file.")
     
-    print()
     return html, images
 
 
@@ -384,42 +559,102 @@ def load_local_zip(zip_path: str) -> tuple:
 # IMAGE HANDLING
 # =============================================================================
 
-def download_image(img_url: str, images_dir: Path, index: int) -> str | None:
-    """Download an image and return the local filename, or None on failure."""
+def download_image(img_url: str, images_dir: Path, index: int) -> tuple[str | None, str]:
+    """
+    Download an image. Returns (local filename or None on failure, status line);
+    the caller prints the status, so lines from worker threads never interleave.
+    """
+    filepath = None
     try:
-        response = requests.get(img_url, timeout=30)
-        response.raise_for_status()
-        
-        # Determine extension from content type
-        content_type = response.headers.get('content-type', 'image/png')
-        ext_map = {
-            'image/png': '.png',
-            'image/jpeg': '.jpg',
-            'image/gif': '.gif',
-            'image/webp': '.webp',
-            'image/svg+xml': '.svg',
-        }
-        ext = ext_map.get(content_type.split(';')[0], '.png')
-        
-        # Create unique filename using hash of URL
-        url_hash = hashlib.md5(img_url.encode()).hexdigest()[:8]
-        filename = f"img_{index:02d}_{url_hash}{ext}"
-        
-        filepath = images_dir / filename
-        filepath.write_bytes(response.content)
+        # Stream the body straight to disk rather than buffering it in memory
+        with get_session().get(img_url, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            
+            # Determine extension from content type
+            content_type = response.headers.get('content-type', 'image/png')
+            ext_map = {
+                'image/png': '.png',
+                'image/jpeg': '.jpg',
+                'image/gif': '.gif',
+                'image/webp': '.webp',
+                'image/svg+xml': '.svg',
+            }
+            ext = ext_map.get(content_type.split(';')[0], '.png')
+            
+            # Create unique filename using hash of URL
+            url_hash = hashlib.blake2b(img_url.encode('utf-8'), digest_size=4).hexdigest()
+            filename = f"img_{index:02d}_{url_hash}{ext}"
+            
+            filepath = images_dir / filename
+            with open(filepath, 'wb') as fh:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    fh.write(chunk)
         
-        print(f"   📷 Downloaded: {filename}")
-        return filename
+        return filename, f"   📷 Downloaded: {filename}"
         
     except Exception as e:
-        print(f"   ⚠️  Failed to download image: {e}")
-        return None
+        # Don't leave a truncated image behind
+        if filepath is not None:
+            filepath.unlink(missing_ok=True)
+        return None, f"   ⚠️  Failed to download image: {e}"
+
+
+def write_zip_images(images_dir: Path, images: list[tuple[str, zipfile.Path]]) -> None:
+    """
+    Write (filename, zip entry) pairs into images_dir in one pass.
+    The folder is opened once and each file is created relative to it,
+    so no path is resolved again per image.
+    """
+    if os.open not in os.supports_dir_fd:
+        # No dir_fd support (e.g. Windows): plain path writes
+        for filename, entry in images:
+            (images_dir / filename).write_bytes(entry.read_bytes())
+            print(f"   📷 Saved from zip: {filename}")
+        return
+    
+    dir_fd = os.open(images_dir, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        for filename, entry in images:
+            data = memoryview(entry.read_bytes())
+            fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644, dir_fd=dir_fd)
+            try:
+                while data:
+                    data = data[os.write(fd, data):]
+            finally:
+                os.close(fd)
+            print(f"   📷 Saved from zip: {filename}")
+    finally:
+        os.close(dir_fd)
 
 
 # =============================================================================
 # CONTENT PARSING
 # =============================================================================
 
+def make_slug(title: str, max_length: int = 50) -> str:
+    """
+    Turn a post title into a filename slug, same as python-slugify's slugify().
+    Plain ASCII titles go through one translate() call; anything else
+    (accents, HTML entities) is handed to python-slugify.
+    """
+    if not title.isascii() or '&' in title:
+        from slugify import slugify
+        return slugify(title, max_length=max_length)
+
+    slug = title.replace("'", '-').lower()
+    slug = _SLUG_NUMBER_COMMA_RE.sub('', slug)  # "1,000" -> "1000"
+    slug = _SLUG_DASHES_RE.sub('-', slug.translate(_SLUG_TABLE)).strip('-')
+    return slug[:max_length].strip('-')
+
+
+def _truncate_on_space(text: str, limit: int) -> str:
+    """Cut text at the last space before `limit` characters, adding '...' when shortened."""
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(' ', 0, limit)
+    return text[:cut if cut != -1 else limit] + '...'
+
+
 def estimate_reading_time(text: str) -> int:
     """Estimate reading time in minutes (assuming 200 words per minute)."""
     words = len(text.split())
@@ -432,13 +667,13 @@ def process_inline_formatting(elem) -> str:
     parts = []
     
     for child in elem.children:
-        if isinstance(child, NavigableString):
+        if child.name is None:  # Text node (NavigableString); tags always have a name
             parts.append(str(child))
         elif child.name == 'a':
             href = child.get('href', '#')
             # Clean Google redirect URLs
             if 'google.com/url' in href:
-                match = re.search(r'[?&]q=([^&]+)', href)
+                match = _GOOG_Q_RE.search(href)
                 if match:
                     href = unquote(match.group(1))
             text = child.get_text()
@@ -447,8 +682,8 @@ def process_inline_formatting(elem) -> str:
             style = child.get('style', '')
             text = child.get_text()
             
-            is_bold = 'font-weight:700' in style or 'font-weight: 700' in style or 'bold' in style.lower()
-            is_italic = 'font-style:italic' in style or 'font-style: italic' in style
+            is_bold = bool(_BOLD_RE.search(style))
+            is_italic = bool(_ITALIC_RE.search(style))
             
             if is_bold and is_italic:
                 text = f'<strong><em>{text}</em></strong>'
@@ -470,7 +705,9 @@ def process_list(elem) -> str:
     items = []
     
     for li in elem.find_all('li', recursive=False):
-        text = li.get_text(strip=True)
+        # A lone string child (the usual Google Docs shape) needs no get_text() walk
+        string = li.string
+        text = string.strip() if string is not None else li.get_text(strip=True)
         if text:
             items.append(f'<li>{text}</li>')
     
@@ -480,9 +717,18 @@ def process_list(elem) -> str:
     return f'<{tag}>\n            ' + '\n            '.join(items) + f'\n          </{tag}>'
 
 
-def parse_google_doc_html(html: str, post_slug: str, blog_root: Path, local_images: dict = None) -> dict:
-    """Parse Google Doc HTML and extract structured content."""
-    soup = BeautifulSoup(html, 'html.parser')
+def parse_google_doc_html(html: str, local_images: dict = None) -> dict:
+    """
+    Parse Google Doc HTML and extract structured content.
+    Nothing is written to disk: the post slug depends on the parsed title,
+    so images are queued and referenced through _IMG_DIR_TOKEN until
+    place_post_images() saves them under the slug.
+    """
+    from bs4 import BeautifulSoup, SoupStrainer
+    
+    # lxml does the tokenizing in C; the strainer keeps BeautifulSoup from
+    # building nodes for <head>, where Docs puts its large <style> block
+    soup = BeautifulSoup(html, 'lxml', parse_only=SoupStrainer('body'))
     
     # Find the body content
     body = soup.find('body')
@@ -496,10 +742,6 @@ def parse_google_doc_html(html: str, post_slug: str, blog_root: Path, local_imag
         title = title_elem.get_text(strip=True)
         title_elem.decompose()  # Remove from content
     
-    # Setup images directory
-    images_dir = blog_root / IMAGES_DIR / post_slug
-    images_dir.mkdir(parents=True, exist_ok=True)
-    
     # Track processed image URLs to avoid duplicates
     processed_images = set()
     
@@ -508,9 +750,16 @@ def parse_google_doc_html(html: str, post_slug: str, blog_root: Path, local_imag
     plain_text_parts = []
     img_index = 0
     
-    for elem in body.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'ul', 'ol', 'img', 'span']):
-        # Skip empty elements
-        text = elem.get_text(strip=True)
+    # Remote images are downloaded together after the walk: (slot in content_parts, src, index, alt)
+    pending_downloads = []
+    
+    # Zip images are written together after the walk: (filename, zip entry)
+    pending_writes = []
+    
+    # Walk the tree lazily rather than materializing a find_all() result list
+    for elem in body.descendants:
+        if elem.name not in _CONTENT_TAGS:
+            continue
         
         if elem.name == 'img':
             src = elem.get('src', '')
@@ -519,32 +768,30 @@ def parse_google_doc_html(html: str, post_slug: str, blog_root: Path, local_imag
                 img_index += 1
                 alt = elem.get('alt', f'Image {img_index}')
                 
-                if local_images:
-                    # Find matching image in zip by filename
-                    src_filename = Path(src).name.split('?')[0]
-                    matched_key = next(
-                        (k for k in local_images if Path(k).name == src_filename), None
-                    )
-                    if matched_key:
-                        # Save image from zip
-                        ext = Path(matched_key).suffix or '.png'
-                        import hashlib
-                        url_hash = hashlib.md5(src.encode()).hexdigest()[:8]
-                        filename = f"img_{img_index:02d}_{url_hash}{ext}"
-                        filepath = images_dir / filename
-                        filepath.write_bytes(local_images[matched_key])
-                        print(f"   📷 Saved from zip: {filename}")
-                        img_path = f"../{IMAGES_DIR}/{post_slug}/{filename}"
-                        content_parts.append(f'<figure><img src="{img_path}" alt="{alt}" loading="lazy"></figure>')
-                    else:
-                        print(f"   ⚠️  Image not found in zip: {src_filename}")
+                # Find matching image in zip by filename
+                src_filename = Path(src).name.split('?')[0]
+                matched_key = next(
+                    (k for k in local_images if Path(k).name == src_filename), None
+                ) if local_images else None
+                
+                if matched_key:
+                    # Save image from zip
+                    ext = Path(matched_key).suffix or '.png'
+                    url_hash = hashlib.blake2b(src.encode('utf-8'), digest_size=4).hexdigest()
+                    filename = f"img_{img_index:02d}_{url_hash}{ext}"
+                    pending_writes.append((filename, local_images[matched_key]))
+                    img_path = f"../{_IMG_DIR_TOKEN}/{filename}"
+                    content_parts.append(f'<figure><img src="{img_path}" alt="{alt}" loading="lazy"></figure>')
+                elif not local_images or src.startswith(('http://', 'https://')):
+                    # Linked rather than embedded in the export: download it
+                    pending_downloads.append((len(content_parts), src, img_index, alt))
+                    content_parts.append(None)
                 else:
-                    local_filename = download_image(src, images_dir, img_index)
-                    if local_filename:
-                        img_path = f"../{IMAGES_DIR}/{post_slug}/{local_filename}"
-                        content_parts.append(f'<figure><img src="{img_path}" alt="{alt}" loading="lazy"></figure>')
+                    print(f"   ⚠️  Image not found in zip: {src_filename}")
             continue
         
+        # Skip empty elements
+        text = elem.get_text(strip=True)
         if not text:
             continue
         
@@ -582,108 +829,191 @@ def parse_google_doc_html(html: str, post_slug: str, blog_root: Path, local_imag
                 content_parts.append(list_html)
             plain_text_parts.append(text)
     
-    # Check for any remaining images we might have missed
-    for img in body.find_all('img'):
-        src = img.get('src', '')
-        if src and src not in processed_images and 'googleusercontent' in src:
-            processed_images.add(src)
-            img_index += 1
-            local_filename = download_image(src, images_dir, img_index)
-            if local_filename:
-                img_path = f"../{IMAGES_DIR}/{post_slug}/{local_filename}"
-                alt = img.get('alt', f'Image {img_index}')
-                content_parts.append(f'<figure><img src="{img_path}" alt="{alt}" loading="lazy"></figure>')
-    
-    # Clean up empty images folder if no images were downloaded
-    if img_index == 0 and images_dir.exists():
-        try:
-            images_dir.rmdir()
-        except OSError:
-            pass  # Folder not empty or other issue, leave it
-    
     plain_text = ' '.join(plain_text_parts)
     reading_time = estimate_reading_time(plain_text)
+    default_subtitle = _truncate_on_space(plain_text, 150) or f"A post about {title}"
     
     return {
         'title': title,
-        'content': '\n          '.join(content_parts),
+        'content_parts': content_parts,
+        'image_writes': pending_writes,
+        'image_downloads': pending_downloads,
         'reading_time': reading_time,
         'plain_text': plain_text,
+        'default_subtitle': default_subtitle,
         'image_count': img_index,
     }
 
 
+def place_post_images(blog_root: Path, post_slug: str, parsed: dict) -> str:
+    """
+    Save the images queued by parse_google_doc_html straight into the
+    post's image folder and return the finished content HTML.
+    """
+    images_dir = blog_root / IMAGES_DIR / post_slug
+    content_parts = list(parsed['content_parts'])
+    
+    # Only create the folder when there is something to put in it
+    if parsed['image_writes'] or parsed['image_downloads']:
+        images_dir.mkdir(parents=True, exist_ok=True)
+    
+    if parsed['image_writes']:
+        write_zip_images(images_dir, parsed['image_writes'])
+    
+    # Download images concurrently, filling each slot in document order
+    if parsed['image_downloads']:
+        with ThreadPoolExecutor(max_workers=IMAGE_DOWNLOAD_WORKERS) as executor:
+            futures = {
+                executor.submit(download_image, src, images_dir, index): (slot, alt)
+                for slot, src, index, alt in parsed['image_downloads']
+            }
+            for future in as_completed(futures):
+                slot, alt = futures[future]
+                local_filename, status = future.result()
+                print(status)
+                if local_filename:
+                    img_path = f"../{_IMG_DIR_TOKEN}/{local_filename}"
+                    content_parts[slot] = f'<figure><img src="{img_path}" alt="{alt}" loading="lazy"></figure>'
+    
+    content = '\n          '.join(part for part in content_parts if part is not None)
+    return content.replace(_IMG_DIR_TOKEN, f"{IMAGES_DIR}/{post_slug}")
+
+
 # =============================================================================
 # HTML GENERATION
 # =============================================================================
 
+def _compile_template(template_path: Path) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """
+    Split the template into the static fragments around the fields that
+    generate_post_html fills. Returns (fragments, fields), where fragments
+    has one more entry than fields.
+    """
+    stat = template_path.stat()
+    return _load_compiled_template(str(template_path), stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_compiled_template(path: str, mtime_ns: int, size: int) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """
+    Compile the template at `path`, or load an earlier compile of the same
+    version from CACHE_DIR/templates (keyed by path, mtime and size, plus the
+    fill pattern, since editing TEMPLATE_PATTERNS changes the split).
+    """
+    key_source = f"{path}\0{mtime_ns}\0{size}\0{_TEMPLATE_FILL_RE.pattern}"
+    key = hashlib.blake2b(key_source.encode('utf-8'), digest_size=8).hexdigest()
+    cache_path = BLOG_ROOT / CACHE_DIR / "templates" / f"{key}.pkl"
+    
+    try:
+        with open(cache_path, 'rb') as fh:
+            return pickle.load(fh)
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        pass  # No usable cache, compile below
+    
+    template = _read_template(path, mtime_ns, size)
+    
+    fragments = []
+    fields = []
+    pos = 0
+    for match in _TEMPLATE_FILL_RE.finditer(template):
+        fragments.append(template[pos:match.start()])
+        fields.append(match.lastgroup)
+        pos = match.end()
+    fragments.append(template[pos:])
+    compiled = (tuple(fragments), tuple(fields))
+    
+    # Write beside the target and swap it in, so a reader never sees a partial pickle
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+        with open(tmp_path, 'wb') as fh:
+            pickle.dump(compiled, fh)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # Caching is best effort
+    
+    return compiled
+
+
 def generate_post_html(template_path: Path, post_data: dict) -> tuple[str, list[str]]:
     """
     Generate the final post HTML from the template.
     Returns (html, list of warnings).
     """
-    template = template_path.read_text(encoding='utf-8')
-    warnings = []
-    
-    def safe_replace(pattern: str, replacement: str, flags: int = 0) -> None:
-        """Replace pattern and track if it worked."""
-        nonlocal template, warnings
-        new_template = re.sub(pattern, replacement, template, flags=flags)
-        if new_template == template:
-            warnings.append(f"Pattern not found: {pattern[:60]}...")
-        template = new_template
-    
-    # Escape special characters in content for regex replacement
-    title = post_data['title'].replace('\\', '\\\\').replace('$', '\\$')
-    subtitle = post_data['subtitle'].replace('\\', '\\\\').replace('$', '\\$')
-    
-    # Replace title tag
-    safe_replace(
-        r'<title>.*?</title>',
-        f'<title>{title} - {AUTHOR_NAME}</title>'
-    )
-    
-    # Replace meta description
-    safe_replace(
-        r'<meta name="description"\s+content="[^"]*">',
-        f'<meta name="description"\n    content="{subtitle}">'
-    )
-    
-    # Replace post header title
-    safe_replace(
-        r'<h1 class="post-header__title">.*?</h1>',
-        f'<h1 class="post-header__title">{title}</h1>'
-    )
+    title = post_data['title']
+    subtitle = post_data['subtitle']
     
-    # Replace subtitle
-    safe_replace(
-        r'<p class="post-header__subtitle">.*?</p>',
-        f'<p class="post-header__subtitle">{subtitle}</p>'
-    )
-    
-    # Replace date and reading time
     date_html = f'''<p class="post-header__meta">
             <time datetime="{post_data["date_iso"]}">{post_data["date_formatted"]}</time> · {post_data["reading_time"]} min read
           </p>'''
-    safe_replace(
-        r'<p class="post-header__meta">.*?</p>',
-        date_html,
-        flags=re.DOTALL
-    )
     
-    # Replace post body content
-    content = post_data['content'].replace('\\', '\\\\').replace('$', '\\$')
-    safe_replace(
-        r'<div class="post-body">.*?</div>\s*\n\s*<div class="author-card">',
-        f'<div class="post-body">\n          {content}\n        </div>\n\n        <div class="author-card">',
-        flags=re.DOTALL
-    )
+    replacements = {
+        'title_tag': f'<title>{title} - {AUTHOR_NAME}</title>',
+        'meta_description': f'<meta name="description"\n    content="{subtitle}">',
+        'post_title': f'<h1 class="post-header__title">{title}</h1>',
+        'post_subtitle': f'<p class="post-header__subtitle">{subtitle}</p>',
+        'post_meta': date_html,
+        'post_body': f'<div class="post-body">\n          {post_data["content"]}\n        </div>\n\n        <div class="author-card">',
+    }
+    
+    # Stitch the values between the template's static fragments; they are
+    # inserted literally, so backslashes and dollars need no escaping
+    fragments, fields = _compile_template(template_path)
+    parts = [fragments[0]]
+    for name, fragment in zip(fields, fragments[1:]):
+        parts.append(replacements[name])
+        parts.append(fragment)
+    html = ''.join(parts)
+    
+    warnings = [
+        f"Pattern not found: {TEMPLATE_PATTERNS[name][0].pattern[:60]}..."
+        for name in _FILL_FIELDS if name not in fields
+    ]
+    
+    return html, warnings
+
+
+def write_files(writes: list[tuple[Path, str]], backup: Path | None = None) -> None:
+    """
+    Write several (path, text) pairs as one batch. Each file goes to a
+    <name>.tmp with a single open and raw os.write, then all are swapped
+    into place with os.replace, so a crash never leaves a half-written
+    file behind. If `backup` is one of the paths and exists, its previous
+    version is kept as <name>.bak. Nothing is fsynced: git reads these
+    files straight back.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    staged = []
     
-    return template, warnings
+    for path, text in writes:
+        tmp_path = path.with_name(path.name + '.tmp')
+        data = memoryview(text.encode('utf-8'))
+        fd = os.open(tmp_path, flags, 0o644)
+        try:
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
+        staged.append((tmp_path, path))
+    
+    for tmp_path, path in staged:
+        if path == backup and path.exists():
+            # Hard-link the current file as the backup (no data copy)
+            backup_path = path.with_name(path.name + '.bak')
+            backup_path.unlink(missing_ok=True)
+            try:
+                os.link(path, backup_path)
+            except OSError:
+                shutil.copy(path, backup_path)  # Filesystem without hard links
+        os.replace(tmp_path, path)
 
 
-def update_index_page(index_path: Path, post_data: dict) -> tuple:
-    """Add or update the post entry in the index page. Returns (success, message)."""
+def prepare_index_page(index_path: Path, post_data: dict) -> tuple:
+    """
+    Build the index page with the post's entry added or updated.
+    Returns (new_content, message); new_content is None on failure.
+    The caller writes it, backing up the old page as index.html.bak.
+    """
     content = index_path.read_text(encoding='utf-8')
     original = content
 
@@ -700,26 +1030,25 @@ def update_index_page(index_path: Path, post_data: dict) -> tuple:
             </a>
           </li>'''
 
-    # Check if this post already exists in the index
-    existing_pattern = rf'<li class="post-item">.*?href="posts/{re.escape(post_data["filename"])}".*?</li>'
-    if re.search(existing_pattern, content, re.DOTALL):
-        # Update existing entry
-        content = re.sub(existing_pattern, new_entry, content, flags=re.DOTALL)
+    # Check if this post already exists in the index. Find its link, then
+    # splice out just the <li> around it; a lazy .*? regex anchored on the
+    # first post-item would span (and drop) every entry listed before it.
+    link_pos = content.find(f'href="posts/{post_data["filename"]}"')
+    if link_pos != -1:
+        start = content.rfind('<li class="post-item">', 0, link_pos)
+        end = content.find('</li>', link_pos)
+        if start == -1 or end == -1:
+            return None, "Found existing entry but could not update it"
+        content = content[:start] + new_entry + content[end + len('</li>'):]
         if content == original:
-            return False, "Found existing entry but could not update it"
-        backup_path = index_path.with_suffix('.html.bak')
-        shutil.copy(index_path, backup_path)
-        index_path.write_text(content, encoding='utf-8')
-        return True, f"Updated existing entry in index.html (backup: {backup_path.name})"
-
-    # Not found — insert as new entry
-    pattern = r'(<ul class="posts-list">)\s*'
-    if re.search(pattern, content):
-        content = re.sub(
-            pattern,
-            f'\\1\n          {new_entry}\n          ',
-            content
-        )
+            return None, "Found existing entry but could not update it"
+        return content, f"Updated existing entry in index.html (backup: {index_path.name}.bak)"
+
+    # Not found — insert as new entry right after the list's opening tag
+    match = _POSTS_LIST_RE.search(content)
+    if match:
+        content = (f'{content[:match.start()]}{match.group(1)}\n          {new_entry}\n          '
+                   f'{content[match.end():]}')
     elif '<!-- Posts will be added here -->' in content:
         content = content.replace(
             '<!-- Posts will be added here -->',
@@ -727,21 +1056,20 @@ def update_index_page(index_path: Path, post_data: dict) -> tuple:
         )
 
     if content == original:
-        return False, "Could not find insertion point in index.html"
+        return None, "Could not find insertion point in index.html"
 
-    backup_path = index_path.with_suffix('.html.bak')
-    shutil.copy(index_path, backup_path)
-    index_path.write_text(content, encoding='utf-8')
-    return True, f"Added new entry to index.html (backup: {backup_path.name})"
+    return content, f"Added new entry to index.html (backup: {index_path.name}.bak)"
 
 # =============================================================================
 # GIT OPERATIONS
 # =============================================================================
 
-def git_push(blog_root: Path, post_title: str, dry_run: bool = False) -> bool:
-    """Commit and push changes to Git. Returns True on success."""
-    os.chdir(blog_root)
-    
+def git_push(blog_root: Path, post_title: str, dry_run: bool = False, wait: bool = True):
+    """
+    Commit and push changes to Git. Returns True on success.
+    With wait=False the push is left running and its Popen handle is returned
+    instead; pass it to finish_push() once there is nothing else to do.
+    """
     if dry_run:
         print("\n🔍 Dry run - would execute:")
         print(f"   git add .")
@@ -751,40 +1079,65 @@ def git_push(blog_root: Path, post_title: str, dry_run: bool = False) -> bool:
     
     print("\n📤 Pushing to Git...")
     
+    commit_msg = f"Add new post: {post_title}"
+    
+    # Add and commit from a single shell; the exit code tells which step failed
+    script = (
+        f"git add . || exit 10\n"
+        f"git commit -m {shlex.quote(commit_msg)} || exit 11\n"
+    )
+    
     try:
-        # Add all changes
-        result = subprocess.run(['git', 'add', '.'], capture_output=True, text=True)
-        if result.returncode != 0:
-            print(f"   ⚠️  git add failed: {result.stderr}")
-            return False
+        if shutil.which('sh'):
+            subprocess.run(['sh', '-c', script], cwd=blog_root, capture_output=True, text=True, check=True)
+        else:
+            # No POSIX shell (e.g. plain Windows): run the steps directly,
+            # failing with the same exit codes the script uses
+            for code, cmd in ((10, ['git', 'add', '.']), (11, ['git', 'commit', '-m', commit_msg])):
+                result = subprocess.run(cmd, cwd=blog_root, capture_output=True, text=True)
+                if result.returncode != 0:
+                    raise subprocess.CalledProcessError(code, cmd, result.stdout, result.stderr)
         
-        # Commit
-        commit_msg = f"Add new post: {post_title}"
-        result = subprocess.run(['git', 'commit', '-m', commit_msg], capture_output=True, text=True)
-        if result.returncode != 0:
-            if 'nothing to commit' in result.stdout:
+        # The push is network-bound; start it and let the caller decide when to wait
+        push = subprocess.Popen(
+            ['git', 'push', GIT_REMOTE, GIT_BRANCH],
+            cwd=blog_root, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        )
+        
+    except subprocess.CalledProcessError as e:
+        if e.returncode == 10:
+            print(f"   ⚠️  git add failed: {e.stderr}")
+            return False
+        if e.returncode == 11:
+            if 'nothing to commit' in e.stdout:
                 print("   ℹ️  Nothing to commit (no changes)")
                 return True
-            print(f"   ⚠️  git commit failed: {result.stderr}")
-            return False
-        
-        # Push
-        result = subprocess.run(['git', 'push', GIT_REMOTE, GIT_BRANCH], capture_output=True, text=True)
-        if result.returncode != 0:
-            print(f"   ⚠️  git push failed: {result.stderr}")
-            print("\n   Your post was created locally. Push manually with:")
-            print(f"   git push {GIT_REMOTE} {GIT_BRANCH}")
+            print(f"   ⚠️  git commit failed: {e.stderr}")
             return False
-        
-        print("   ✅ Successfully pushed to Git!")
-        return True
-        
+        print(f"   ⚠️  Git error: {e.stderr}")
+        return False
     except FileNotFoundError:
         print("   ⚠️  Git is not installed or not in PATH")
         return False
     except Exception as e:
         print(f"   ⚠️  Git error: {e}")
         return False
+    
+    return finish_push(push) if wait else push
+
+
+def finish_push(push: subprocess.Popen) -> bool:
+    """Wait for a push started by git_push(wait=False) and report it. Returns True on success."""
+    _, stderr = push.communicate()
+    
+    if push.returncode != 0:
+        print(f"   ⚠️  git push failed: {stderr}")
+        print("\n   Your post was created locally. Push manually with:")
+        print(f"   git push {GIT_REMOTE} {GIT_BRANCH}")
+        return False
+    
+    print("   ✅ Successfully pushed to Git!")
+    return True
 
 
 # =============================================================================
@@ -840,6 +1193,8 @@ Examples:
     if not args.url:
         parser.error("URL is required (use --verify to check setup without a URL)")
     
+    check_dependencies()
+    
     # Quick environment check
     print("🔍 Checking environment...")
     env_ok, env_issues = verify_environment()
@@ -864,7 +1219,8 @@ Examples:
     
     # Detect if input is a zip file or a URL
     local_images = {}
-    is_zip = args.url.endswith('.zip') or (Path(args.url).exists() and Path(args.url).suffix == '.zip')
+    # Decided by name alone, so a doc URL never costs a stat() call
+    is_zip = args.url.endswith('.zip')
     
     if is_zip:
         try:
@@ -881,32 +1237,32 @@ Examples:
             sys.exit(1)
         
         try:
-            html, _ = download_google_doc(doc_id)
+            html, local_images = download_google_doc(doc_id)
         except PublishError as e:
             print(f"❌ {e}")
             sys.exit(1)
     
-    # Parse to get title first (for slug generation)
+    # Parse once; images are saved after the title gives us the slug
     print("📝 Parsing document...")
     try:
-        temp_data = parse_google_doc_html(html, "temp", BLOG_ROOT, local_images)
+        parsed = parse_google_doc_html(html, local_images)
     except PublishError as e:
         print(f"❌ {e}")
         sys.exit(1)
         
-    if not temp_data['title']:
+    if not parsed['title']:
         print("❌ Could not extract title from document.")
         print("   Make sure your document has a heading at the top (Heading 1 or 2).")
         sys.exit(1)
     
-    print(f"   Title: {temp_data['title']}")
+    print(f"   Title: {parsed['title']}")
     
     # Generate slug from title
-    post_slug = slugify(temp_data['title'], max_length=50)
+    post_slug = make_slug(parsed['title'], max_length=50)
     filename = f"{post_slug}.html"
     print(f"   Filename: {filename}")
-    print(f"   Reading time: ~{temp_data['reading_time']} min")
-    print(f"   Images: {temp_data['image_count']}")
+    print(f"   Reading time: ~{parsed['reading_time']} min")
+    print(f"   Images: {parsed['image_count']}")
     
     # Check if file already exists
     post_path = BLOG_ROOT / POSTS_DIR / filename
@@ -917,23 +1273,17 @@ Examples:
             print("   Aborted.")
             sys.exit(0)
     
-    # Clean up temp images folder if it was created
-    temp_images = BLOG_ROOT / IMAGES_DIR / "temp"
-    if temp_images.exists():
-        shutil.rmtree(temp_images, ignore_errors=True)
-    
-    # Now parse again with correct slug for images
-    print(f"\n📥 Processing content and images...")
-    parsed = parse_google_doc_html(html, post_slug, BLOG_ROOT, local_images)
+    # Save images straight into the post's folder
+    if parsed['image_count']:
+        print("\n📥 Saving images...")
+    parsed['content'] = place_post_images(BLOG_ROOT, post_slug, parsed)
     
     # Get subtitle from user
     print("\n" + "="*50)
-    subtitle = input("📋 Enter subtitle/description for SEO:\n> ").strip()
-    if not subtitle:
-        # Generate a default subtitle from first paragraph
-        first_para = parsed['plain_text'][:150].rsplit(' ', 1)[0] + '...' if len(parsed['plain_text']) > 150 else parsed['plain_text']
-        subtitle = first_para or f"A post about {parsed['title']}"
-        print(f"   Using: {subtitle[:60]}...")
+    # Enter keeps the default, built from the opening text while parsing
+    subtitle = input(
+        f"📋 Enter subtitle/description for SEO [{parsed['default_subtitle'][:60]}...]:\n> "
+    ).strip() or parsed['default_subtitle']
     
     # Prepare post data
     now = datetime.now()
@@ -943,8 +1293,8 @@ Examples:
         'content': parsed['content'],
         'filename': filename,
         'slug': post_slug,
-        'date_iso': now.strftime('%Y-%m-%d'),
-        'date_formatted': now.strftime('%B %d, %Y'),
+        'date_iso': f'{now.year:04d}-{now.month:02d}-{now.day:02d}',
+        'date_formatted': f'{_MONTHS[now.month - 1]} {now.day:02d}, {now.year}',
         'reading_time': parsed['reading_time'],
     }
     
@@ -970,21 +1320,24 @@ Examples:
                 print("   Aborted.")
                 sys.exit(1)
     
-    # Save the post
-    post_path.write_text(post_html, encoding='utf-8')
-    print(f"   ✅ Created: {post_path}")
-    
-    # Update index page
+    # Save the post and the updated index page together
     index_path = BLOG_ROOT / INDEX_FILE
-    index_success, index_message = update_index_page(index_path, post_data)
-    if index_success:
+    index_content, index_message = prepare_index_page(index_path, post_data)
+    writes = [(post_path, post_html)]
+    if index_content is not None:
+        writes.append((index_path, index_content))
+    write_files(writes, backup=index_path)
+    
+    print(f"   ✅ Created: {post_path}")
+    if index_content is not None:
         print(f"   ✅ {index_message}")
     else:
         print(f"   ⚠️  {index_message}")
     
-    # Push to Git
+    # Commit, and start the push; it runs while the summary is printed
+    push = None
     if not args.no_push:
-        git_push(BLOG_ROOT, post_data['title'], dry_run=args.dry_run)
+        push = git_push(BLOG_ROOT, post_data['title'], dry_run=args.dry_run, wait=False)
     else:
         print("\n⏭️  Skipping Git push (--no-push flag)")
         print("   When ready, run:")
@@ -998,6 +1351,10 @@ Examples:
         print(f"   🖼️  Images: {BLOG_ROOT / IMAGES_DIR / post_slug}/")
     if not args.no_push:
         print("   🌐 Check your website in a few minutes after Cloudflare deploys.")
+    
+    if isinstance(push, subprocess.Popen):
+        print("\n📤 Waiting for git push...")
+        finish_push(push)
 
 
 if __name__ == '__main__':